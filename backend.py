@@ -1,96 +1,192 @@
 import sqlite3
 import json
+import threading
 import time
 
+try:
+    import orjson
+
+    def _dumps(obj):
+        # OPT_NON_STR_KEYS stringifies int/float/bool/None keys like json.dumps
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+except ImportError:
+    _dumps = json.dumps
+
+_CONN = None
+# The connection is shared by every thread, so anything that runs statements
+# on it holds this lock; otherwise two threads' BEGIN/COMMIT would interleave
+_LOCK = threading.Lock()
+
+def _insert_sql(table, cols):
+    return f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+
+# Columns written by the add_* functions. The INSERT text is built from them
+# once here, so every call hits sqlite3's per-connection cache of prepared
+# statements instead of being parsed and planned again.
+_DECK_COLS = ('name', 'parent_deck_id')
+_TYPE_COLS = ('fields', 'tags', 'modified_at')
+_CARD_COLS = (
+    'card_type_id', 'deck_id', 'card_ord',
+    'created_at', 'next_due', 'template_front', 'template_back', 'is_active'
+)
+
+_SQL_INS_DECK = _insert_sql('decks', _DECK_COLS)
+_SQL_INS_TYPE = _insert_sql('card_types', _TYPE_COLS)
+_SQL_INS_CARD = _insert_sql('cards', _CARD_COLS)
+
+# Every deck with its full path from the root, parents before children.
+# Path components are joined with the ASCII unit separator (char 31).
+_SQL_DECK_PATHS = '''
+WITH RECURSIVE t(id, name, parent_deck_id, path) AS (
+    SELECT id, name, parent_deck_id, name FROM decks WHERE parent_deck_id IS NULL
+    UNION ALL
+    SELECT d.id, d.name, d.parent_deck_id, t.path || char(31) || d.name
+    FROM decks d JOIN t ON d.parent_deck_id = t.id
+)
+SELECT id, path FROM t ORDER BY path
+'''
+
+def _tune(conn):
+    # page_size only takes effect on a new, empty database, and has to come
+    # before the switch to WAL
+    conn.execute('PRAGMA page_size=4096')
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA foreign_keys=ON')
+    conn.execute('PRAGMA mmap_size=268435456')  # 256 MB
+    conn.execute('PRAGMA busy_timeout=5000')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-20000')  # ~20 MB page cache
+
+def _get_conn():
+    # one connection for the whole process; opening a new one per call
+    # re-reads the schema and rebuilds the page cache every time
+    global _CONN
+    if _CONN is None:
+        with _LOCK:
+            if _CONN is None:
+                conn = sqlite3.connect('main.db', isolation_level=None, check_same_thread=False)
+                _tune(conn)
+                _CONN = conn
+    return _CONN
+
 def create_db():
-    conn = sqlite3.connect('main.db')
-    cursor = conn.cursor()
-
-    # Create decks table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS decks (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        parent_deck_id INTEGER,
-        FOREIGN KEY (parent_deck_id) REFERENCES decks(id)
-    );
-    ''')
-
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS card_types (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        fields TEXT NOT NULL,
-        tags TEXT,
-        modified_at INTEGER NOT NULL
-    );
-    ''')
-
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS cards (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        card_type_id INTEGER,
-        deck_id INTEGER,
-        card_ord INTEGER,
-        created_at INTEGER NOT NULL,
-        next_due INTEGER,
-        template_front TEXT,
-        template_back TEXT,
-        is_active BOOLEAN DEFAULT 1,
-        FOREIGN KEY (card_type_id) REFERENCES card_types(id),
-        FOREIGN KEY (deck_id) REFERENCES decks(id)
-    );
-    ''')
-
-    conn.commit()
-    conn.close()
+    conn = _get_conn()
+    with _LOCK:
+        cursor = conn.cursor()
+
+        # Create decks table
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS decks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            parent_deck_id INTEGER,
+            FOREIGN KEY (parent_deck_id) REFERENCES decks(id)
+        );
+        ''')
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS card_types (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fields TEXT NOT NULL,
+            tags TEXT,
+            modified_at INTEGER NOT NULL
+        );
+        ''')
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cards (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            card_type_id INTEGER,
+            deck_id INTEGER,
+            card_ord INTEGER,
+            created_at INTEGER NOT NULL,
+            next_due INTEGER,
+            template_front TEXT,
+            template_back TEXT,
+            is_active BOOLEAN DEFAULT 1,
+            FOREIGN KEY (card_type_id) REFERENCES card_types(id),
+            FOREIGN KEY (deck_id) REFERENCES decks(id)
+        );
+        ''')
+
+        # Due cards per deck
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cards_deck_due ON cards(deck_id, next_due) WHERE is_active = 1;
+        ''')
+
+def _with_txn(conn, fn):
+    # the connection is in autocommit mode, so open the transaction explicitly;
+    # a whole batch then pays for a single journal sync instead of one per row
+    with _LOCK:
+        conn.execute('BEGIN')
+        try:
+            result = fn(conn.cursor())
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        return result
+
+def bulk_insert(conn, sql, rows):
+    # All rows go through one executemany in one transaction. executemany
+    # pulls rows from the iterable one at a time and binds each row on its
+    # own, so generators stream and SQLite's 999-variable limit never applies.
+    _with_txn(conn, lambda cursor: cursor.executemany(sql, rows))
+
+def add_decks(rows):
+    # rows: iterable of (name, parent_deck_id) tuples
+    bulk_insert(_get_conn(), _SQL_INS_DECK, rows)
 
 def add_deck(name, parent_deck_id=None):
-    conn = sqlite3.connect('main.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-    INSERT INTO decks (name, parent_deck_id)
-    VALUES (?, ?)
-    ''', (name, parent_deck_id))
-    conn.commit()
-    conn.close()
-
-def add_card_type(fields_dict, tags=None):
-    conn = sqlite3.connect('main.db')
-    cursor = conn.cursor()
-
-    fields_json = json.dumps(fields_dict)
+    add_decks([(name, parent_deck_id)])
+
+def _fields_json(fields):
+    # already-serialized JSON is passed through as is
+    if isinstance(fields, bytes):
+        return fields.decode()
+    return fields if isinstance(fields, str) else _dumps(fields)
+
+def add_card_types(rows):
+    # rows: iterable of (fields, tags) tuples; fields is a dict or a JSON string
     modified_at = int(time.time())
+    params = ((_fields_json(fields), tags, modified_at) for fields, tags in rows)
+    bulk_insert(_get_conn(), _SQL_INS_TYPE, params)
 
-    cursor.execute('''
-    INSERT INTO notes (fields, tags, modified_at)
-    VALUES (?, ?, ?)
-    ''', (fields_json, tags, modified_at))
-    
-    card_type_id = cursor.lastrowid
+def add_card_type(fields, tags=None):
+    fields_json = _fields_json(fields)
+    modified_at = int(time.time())
 
-    conn.commit()
-    conn.close()
-    return card_type_id
+    def insert(cursor):
+        cursor.execute(_SQL_INS_TYPE, (fields_json, tags, modified_at))
+        return cursor.lastrowid
 
-def add_card(card_type_id, deck_id, card_ord, template_front, template_back, next_due=None, is_active=True):
-    conn = sqlite3.connect('main.db')
-    cursor = conn.cursor()
+    return _with_txn(_get_conn(), insert)
 
-    created_at = int(time.time())
+def _card_params(created_at, card_type_id, deck_id, card_ord, template_front, template_back, next_due=None, is_active=True):
     next_due = next_due or created_at + 86400  # default: due in 1 day
-
-    cursor.execute('''
-    INSERT INTO cards (
+    return (
         card_type_id, deck_id, card_ord,
-        created_at, next_due, template_front, template_back, is_active
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        card_type_id, deck_id, int(is_active), card_ord,
-        created_at, next_due, template_front, template_back
-    ))
-
-    conn.commit()
-    conn.close()
+        created_at, next_due, template_front, template_back, int(is_active)
+    )
+
+def add_cards(rows):
+    # rows: iterable of tuples in add_card's argument order. When importing
+    # many cards pass them all here in one list rather than calling add_card
+    # in a loop, so the whole import is committed once.
+    created_at = int(time.time())
+    params = (_card_params(created_at, *row) for row in rows)
+    bulk_insert(_get_conn(), _SQL_INS_CARD, params)
+
+def add_card(card_type_id, deck_id, card_ord, template_front, template_back, next_due=None, is_active=True):
+    add_cards([(card_type_id, deck_id, card_ord, template_front, template_back, next_due, is_active)])
+
+def list_decks_with_paths():
+    # [(deck_id, [name, ..., name])] for the whole deck tree in one query,
+    # rather than one query per deck to walk up its parents
+    conn = _get_conn()
+    with _LOCK:
+        return [(deck_id, path.split('\x1f')) for deck_id, path in conn.execute(_SQL_DECK_PATHS)]
 
 if __name__ == "__main__":
     create_db()
\ No newline at end of file
@@ -1,32 +1,60 @@
 #!/usr/bin/env python3
 
 import sys
-from functools import partial
+from array import array
+
+from backend import create_db, list_decks_with_paths
 
 try:
     # Prefer PySide6
     from PySide6.QtWidgets import (
         QApplication, QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QSpacerItem,
-        QSizePolicy, QTreeWidget, QTreeWidgetItem, QPushButton, QLabel, QDialog,
-        QHeaderView, QToolButton
+        QSizePolicy, QTreeView, QPushButton, QLabel, QDialog,
+        QHeaderView, QStyledItemDelegate
     )
-    from PySide6.QtCore import Qt
-    from PySide6.QtGui import QFont, QBrush, QColor
+    from PySide6.QtCore import Qt, QAbstractItemModel, QEvent, QModelIndex, QRect, Signal
+    from PySide6.QtGui import QFont, QFontMetrics, QBrush, QColor
     QT_BACKEND = "PySide6"
 except Exception:
     try:
         # Fallback PyQt5
         from PyQt5.QtWidgets import (
             QApplication, QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QSpacerItem,
-            QSizePolicy, QTreeWidget, QTreeWidgetItem, QPushButton, QLabel, QDialog,
-            QHeaderView, QToolButton
+            QSizePolicy, QTreeView, QPushButton, QLabel, QDialog,
+            QHeaderView, QStyledItemDelegate
         )
-        from PyQt5.QtCore import Qt
-        from PyQt5.QtGui import QFont, QBrush, QColor
+        from PyQt5.QtCore import Qt, QAbstractItemModel, QEvent, QModelIndex, QRect, pyqtSignal as Signal
+        from PyQt5.QtGui import QFont, QFontMetrics, QBrush, QColor
         QT_BACKEND = "PyQt5"
     except Exception:
         raise RuntimeError("PySide6 or PyQt5 is required. Install with `pip install PySide6` or `pip install PyQt5`.")
 
+# Count column colors: New (blue), Learn (red), Due (green); grey for zero
+_PALETTE = {1: "#4ea0ff", 2: "#ff6b6b", 3: "#4cd97b"}
+_BRUSHES = {col: QBrush(QColor(color)) for col, color in _PALETTE.items()}
+_ZERO = QBrush(QColor("#9e9e9e"))
+_DEFAULT = QBrush(QColor("#e6e6e6"))
+
+# Count text for the small values nearly every deck shows
+_SMALL = tuple(str(i) for i in range(1024))
+
+# Stylesheets: grey nav bar with white bold text and no hover highlight,
+# plain white header, dark rounded deck panel
+_NAV_QSS = """
+QWidget#nav_container { background: #3a3a3a; border-radius: 10px; }
+QPushButton { color: white; background: transparent; border: none; padding: 6px 18px; }
+QPushButton:hover { background: transparent; }
+QPushButton:pressed { background: transparent; }
+"""
+
+_HEADER_QSS = "QHeaderView::section { background: transparent; color: white; }"
+
+_TREE_QSS = """
+QTreeView { background: #2f2f2f; border-radius: 12px; padding: 14px; }
+QTreeView::item { padding: 10px 8px; }
+QTreeView::item:selected { background: #1f1f1f; border-radius: 8px; }
+"""
+
 class BlankDialog(QDialog):
     def __init__(self, title: str, parent=None):
         super().__init__(parent)
@@ -37,6 +65,145 @@ class BlankDialog(QDialog):
         layout = QVBoxLayout(self)
         layout.addWidget(lbl)
 
+class DeckSettingsDelegate(QStyledItemDelegate):
+    # Draws the deck options gear on the hovered row instead of keeping a
+    # settings widget alive per row. Rows opt in by storing the options
+    # window title under Qt.UserRole; clicking the gear emits that title.
+    clicked = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._hover_index = QModelIndex()
+        self._font = QFont()
+        self._font.setPixelSize(16)
+
+    def hover_index(self):
+        return self._hover_index
+
+    def set_hover_index(self, index):
+        self._hover_index = index
+
+    def _gear_rect(self, option):
+        r = option.rect.adjusted(0, 0, -8, 0)
+        w = QFontMetrics(self._font).horizontalAdvance("⚙")
+        return QRect(r.right() - w, r.top(), w, r.height())
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        if index == self._hover_index and index.data(Qt.UserRole):
+            painter.save()
+            painter.setFont(self._font)
+            painter.setPen(QColor("#cccccc"))
+            painter.drawText(self._gear_rect(option), Qt.AlignCenter, "⚙")
+            painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton
+                and index == self._hover_index and index.data(Qt.UserRole)
+                and self._gear_rect(option).contains(event.pos())):
+            self.clicked.emit(index.data(Qt.UserRole))
+            return True
+        return super().editorEvent(event, model, option, index)
+
+class DeckTreeModel(QAbstractItemModel):
+    # Deck tree kept column-wise: one flat array per field indexed by node id,
+    # rather than an item object per deck with per-cell text, brush and flags.
+    # Nodes are numbered in insertion order, so parents come before children.
+    # Each index carries its deck path tuple as internal pointer; the tuples
+    # are held in self._keys so they stay alive for the model's lifetime.
+    HEADERS = ("Deck", "New", "Learn", "Due")
+
+    def __init__(self, decks, parent=None):
+        super().__init__(parent)
+        self._names = []
+        self._keys = []
+        self._titles = []          # deck options title; None for implicit parents
+        self._parent = array("i")  # parent node id, -1 for top level
+        self._row = array("i")     # row within the parent
+        self._counts = array("i")  # new, learn, due for node n at 3n .. 3n+2
+        self._children = []
+        self._roots = []
+        # deck path (tuple of names) -> node id, so resolving a path is one
+        # dict lookup per level instead of a scan over that level's siblings
+        self._path_index = {}
+        for path, counts in decks:
+            node = self._node_for_path(path)
+            self._counts[3 * node:3 * node + 3] = array("i", (c or 0 for c in counts))
+            self._titles[node] = "Deck options: " + " / ".join(path)
+
+    def _node_for_path(self, path):
+        node = -1
+        key = ()
+        for name in path:
+            key += (name,)
+            child = self._path_index.get(key)
+            if child is None:
+                siblings = self._roots if node < 0 else self._children[node]
+                child = len(self._names)
+                self._names.append(name)
+                self._keys.append(key)
+                self._titles.append(None)
+                self._parent.append(node)
+                self._row.append(len(siblings))
+                self._counts.extend((0, 0, 0))
+                self._children.append([])
+                siblings.append(child)
+                self._path_index[key] = child
+            node = child
+        return node
+
+    def _node(self, index):
+        return self._path_index[index.internalPointer()]
+
+    def index(self, row, column, parent=QModelIndex()):
+        siblings = self._children[self._node(parent)] if parent.isValid() else self._roots
+        if not (0 <= row < len(siblings) and 0 <= column < len(self.HEADERS)):
+            return QModelIndex()
+        return self.createIndex(row, column, self._keys[siblings[row]])
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid():
+            return QModelIndex()
+        p = self._parent[self._node(index)]
+        if p < 0:
+            return QModelIndex()
+        return self.createIndex(self._row[p], 0, self._keys[p])
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return len(self._roots)
+        if parent.column() > 0:
+            return 0
+        return len(self._children[self._node(parent)])
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = self._node(index)
+        col = index.column()
+        if col == 0:
+            return self._names[node] if role == Qt.DisplayRole else None
+        # implicit parent decks have no counts and no options
+        title = self._titles[node]
+        if title is None:
+            return None
+        val = self._counts[3 * node + col - 1]
+        if role == Qt.DisplayRole:
+            return _SMALL[val] if 0 <= val < len(_SMALL) else str(val)
+        if role == Qt.ForegroundRole:
+            return _ZERO if not val else _BRUSHES.get(col, _DEFAULT)
+        if role == Qt.UserRole and col == 3:
+            return title
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
 class DecksMockup(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -64,6 +231,7 @@ class DecksMockup(QMainWindow):
         # Buttons: Decks, Add, Browse, Stats
         btn_names = ["Decks", "Add", "Browse", "Stats"]
         self.nav_buttons = {}
+        self._dialogs = {}
         for name in btn_names:
             btn = QPushButton(name)
             btn.setFlat(True)
@@ -75,17 +243,13 @@ class DecksMockup(QMainWindow):
             btn.setFont(f)
             # Only non-Decks open a blank window
             if name != "Decks":
-                btn.clicked.connect(partial(self.open_blank, name))
+                btn.setProperty("title", name)
+                btn.clicked.connect(self._dispatch_open_blank)
             self.nav_buttons[name] = btn
             nav_layout.addWidget(btn)
 
         # Style nav container & buttons: grey background, white bold text, no hover highlight
-        nav_container.setStyleSheet("""
-            QWidget#nav_container { background: #3a3a3a; border-radius: 10px; }
-            QPushButton { color: white; background: transparent; border: none; padding: 6px 18px; }
-            QPushButton:hover { background: transparent; } 
-            QPushButton:pressed { background: transparent; }
-        """)
+        nav_container.setStyleSheet(_NAV_QSS)
 
         # Middle: centered deck widget (with vertical spacer above/below)
         central_layout.addItem(QSpacerItem(20, 8, QSizePolicy.Minimum, QSizePolicy.Fixed))
@@ -94,10 +258,26 @@ class DecksMockup(QMainWindow):
         central_layout.addLayout(mid_box)
         mid_box.addItem(QSpacerItem(40, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
 
-        # Deck QTreeWidget (Deck | New | Learn | Due)
-        self.deck_widget = QTreeWidget()
-        self.deck_widget.setColumnCount(4)
-        self.deck_widget.setHeaderLabels(["Deck", "New", "Learn", "Due"])
+        # Example demo data similar to your screenshot
+        demo = [
+            (["Core 6000"], (0,0,0)),
+            (["Dictionaries of Grammar Sentences", "1 - Basic"], (10,1,2)),
+            (["Dictionaries of Grammar Sentences", "2 - Intermediate"], (30,1,2)),
+            (["Dictionaries of Grammar Sentences", "3 - Advanced"], (30,0,0)),
+            (["Sentence Vocab"], (30,2,1)),
+            (["Misc"], (5,4,2)),
+        ]
+        # Real decks when the database has any (whole tree from one query);
+        # review counts aren't stored yet, so those show as 0
+        decks = [(path, (0, 0, 0)) for _deck_id, path in list_decks_with_paths()] or demo
+
+        # Deck QTreeView (Deck | New | Learn | Due); the settings gear is
+        # painted by the delegate on hover
+        self.deck_model = DeckTreeModel(decks, self)
+        self.deck_widget = QTreeView()
+        self.deck_widget.setModel(self.deck_model)
+        self.deck_widget.setUniformRowHeights(True)
+        self.deck_widget.expandAll()
 
         header = self.deck_widget.header()
         hfont = header.font()
@@ -105,7 +285,7 @@ class DecksMockup(QMainWindow):
         hfont.setPointSize(14)
         hfont.setUnderline(True)
         header.setFont(hfont)
-        header.setStyleSheet("QHeaderView::section { background: transparent; color: white; }")
+        header.setStyleSheet(_HEADER_QSS)
         header.setSectionResizeMode(0, QHeaderView.Stretch)
         header.setSectionResizeMode(1, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
@@ -117,126 +297,59 @@ class DecksMockup(QMainWindow):
         self.deck_widget.setFont(font)
         self.deck_widget.setIndentation(16)
         # Dark rounded look for panel
-        self.deck_widget.setStyleSheet("""
-            QTreeWidget { background: #2f2f2f; border-radius: 12px; padding: 14px; }
-            QTreeWidget::item { padding: 10px 8px; }
-            QTreeWidget::item:selected { background: #1f1f1f; border-radius: 8px; }
-        """)
+        self.deck_widget.setStyleSheet(_TREE_QSS)
 
         mid_box.addWidget(self.deck_widget)
         mid_box.addItem(QSpacerItem(40, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
 
         central_layout.addItem(QSpacerItem(20, 24, QSizePolicy.Minimum, QSizePolicy.Expanding))
 
-        # Example demo data similar to your screenshot
-        demo = [
-            (["Core 6000"], (0,0,0)),
-            (["Dictionaries of Grammar Sentences", "1 - Basic"], (10,1,2)),
-            (["Dictionaries of Grammar Sentences", "2 - Intermediate"], (30,1,2)),
-            (["Dictionaries of Grammar Sentences", "3 - Advanced"], (30,0,0)),
-            (["Sentence Vocab"], (30,2,1)),
-            (["Misc"], (5,4,2)),
-        ]
+        self.settings_delegate = DeckSettingsDelegate(self.deck_widget)
+        self.settings_delegate.clicked.connect(self.open_blank)
+        self.deck_widget.setItemDelegateForColumn(3, self.settings_delegate)
 
-        # Create items and a hidden settings button widget per item
-        self.settings_widgets = {}
-        for path, counts in demo:
-            parent = None
-            for i, name in enumerate(path):
-                if parent is None:
-                    top = self._find_top_item(name)
-                    if top is None:
-                        item = QTreeWidgetItem(self.deck_widget, [name, "", "", ""])
-                        item.setExpanded(True)
-                    else:
-                        item = top
-                else:
-                    ch = self._find_child_item(parent, name)
-                    if ch is None:
-                        item = QTreeWidgetItem(parent, [name, "", "", ""])
-                        item.setExpanded(True)
-                    else:
-                        item = ch
-                parent = item
-            # set counts on final item
-            new_c, learn_c, due_c = counts
-            self._set_count_for_item(parent, new_c, 1)
-            self._set_count_for_item(parent, learn_c, 2)
-            self._set_count_for_item(parent, due_c, 3)
-            # create settings button widget for the item (hidden by default)
-            settings_btn = QToolButton()
-            settings_btn.setText("⚙")
-            settings_btn.setCursor(Qt.PointingHandCursor)
-            settings_btn.setStyleSheet("QToolButton { background: transparent; color: #cccccc; border: none; font-size: 16px; }")
-            settings_btn.clicked.connect(partial(self.open_blank, "Deck options: " + " / ".join(path)))
-            container = QWidget()
-            cl = QHBoxLayout(container)
-            cl.setContentsMargins(0, 0, 8, 0)
-            cl.addStretch()
-            cl.addWidget(settings_btn)
-            container.setVisible(False)
-            # put container into the 3rd column (so it sits to the right of 'Due')
-            self.deck_widget.setItemWidget(parent, 3, container)
-            self.settings_widgets[parent] = container
-
-        # Enable mouse tracking for itemEntered to work (show/hide settings)
+        # Enable mouse tracking for entered to work (show/hide settings)
         self.deck_widget.setMouseTracking(True)
         self.deck_widget.viewport().setMouseTracking(True)
-        self.deck_widget.itemEntered.connect(self._on_item_hover)
+        self.deck_widget.entered.connect(self._on_item_hover)
         # ensure settings hidden when leaving
         self.deck_widget.viewport().leaveEvent = self._on_viewport_leave
 
-    def _find_top_item(self, name):
-        for i in range(self.deck_widget.topLevelItemCount()):
-            it = self.deck_widget.topLevelItem(i)
-            if it.text(0) == name:
-                return it
-        return None
+    def _on_item_hover(self, index):
+        self._set_hover(index.sibling(index.row(), 3))
 
-    def _find_child_item(self, parent, name):
-        for i in range(parent.childCount()):
-            it = parent.child(i)
-            if it.text(0) == name:
-                return it
-        return None
+    def _on_viewport_leave(self, event):
+        self._set_hover(QModelIndex())
+        return super(QTreeView, self.deck_widget).leaveEvent(event)
 
-    def _set_count_for_item(self, item, val, col):
-        txt = str(val) if val is not None and val != 0 else "0"
-        item.setText(col, txt)
-        print("col: ", col)
-        # color logic
-        if val == 0:
-            color = "#9e9e9e"
-        else:
-            if col == 1:
-                color = "#4ea0ff"  # blue
-            elif col == 2:
-                color = "#ff6b6b"  # red
-            elif col == 3:
-                color = "#4cd97b"  # green
-            else:
-                color = "#e6e6e6"
-        # set foreground color
-        item.setForeground(col, QBrush(QColor(color)))
-
-    def _on_item_hover(self, item, column):
-        # hide all settings first
-        for w in self.settings_widgets.values():
-            w.setVisible(False)
-        if item in self.settings_widgets:
-            self.settings_widgets[item].setVisible(True)
+    def _set_hover(self, index):
+        # only the previously and newly hovered gear cells need repainting
+        last = self.settings_delegate.hover_index()
+        if index == last:
+            return
+        self.settings_delegate.set_hover_index(index)
+        if last.isValid():
+            self.deck_widget.update(last)
+        if index.isValid():
+            self.deck_widget.update(index)
 
-    def _on_viewport_leave(self, event):
-        for w in self.settings_widgets.values():
-            w.setVisible(False)
-        return super(QTreeWidget, self.deck_widget).leaveEvent(event)
+    def _dispatch_open_blank(self):
+        # shared slot for the nav buttons; the title travels on the sender
+        self.open_blank(self.sender().property("title"))
 
     def open_blank(self, title):
-        dlg = BlankDialog(title, parent=self)
-        dlg.setWindowModality(False)
+        # one dialog per title, built on first open and reused afterwards
+        dlg = self._dialogs.get(title)
+        if dlg is None:
+            dlg = BlankDialog(title, parent=self)
+            dlg.setWindowModality(Qt.NonModal)
+            self._dialogs[title] = dlg
         dlg.show()
+        dlg.raise_()
+        dlg.activateWindow()
 
 def main():
+    create_db()
     app = QApplication(sys.argv)
     # global font a little bigger
     f = app.font()
@@ -24,4 +24,6 @@ CREATE TABLE IF NOT EXISTS cards (
     next_due INTEGER,
     template_front TEXT,
     template_back TEXT
-);
\ No newline at end of file
+);
+
+CREATE INDEX IF NOT EXISTS idx_cards_deck_due ON cards(deck_id, next_due) WHERE is_active = 1;
\ No newline at end of file